@@ -0,0 +1,98 @@
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Torna os módulos de orion_flask_project importáveis
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root / "orion_flask_project"))
+import app as orion_app
+import fraud_service
+from werkzeug.security import generate_password_hash
+
+# Orçamento: a latência p99 adicionada à transferência pelo monitor
+P99_BUDGET_MS = 0.5
+
+
+class _NoMonitor:
+    """Substituto sem custo, usado como linha de base."""
+
+    def is_held(self, account_id):
+        return False
+
+    def submit(self, *args):
+        pass
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def hot_path_latencies(n):
+    """Custo isolado de is_held + submit, com a thread de análise consumindo eventos."""
+    monitor = fraud_service.FraudMonitor(max_transfers_per_minute=10**9, max_fanout=10**9,
+                                         max_new_recipients=10**9, max_received_per_minute=10**9)
+    samples = []
+    for i in range(n):
+        started = time.perf_counter()
+        monitor.is_held(f"s{i % 1000}")
+        monitor.submit(f"s{i % 1000}", f"r{i % 5000}", f"{i % 5000:011d}", 10.0)
+        samples.append(time.perf_counter() - started)
+    monitor.join()
+    return samples
+
+
+def transfer_latencies(monitor, n):
+    """Latência ponta a ponta de /api/transfer via test client do Flask."""
+    orion_app.fraud_monitor = monitor
+    users = {
+        uid: {
+            "email": f"{uid}@orion.com",
+            "password_hash": generate_password_hash("x", method="pbkdf2:sha256:1"),
+            "nome": uid,
+            "cpf": cpf,
+            "is_admin": False,
+            "balance": 10.0**9,
+            "transactions": [],
+        }
+        for uid, cpf in (("alice", "11111111111"), ("bob", "22222222222"))
+    }
+    orion_app.save_users(users)
+
+    client = orion_app.app.test_client()
+    with client.session_transaction() as s:
+        s["user_id"] = "alice"
+    samples = []
+    for _ in range(n):
+        started = time.perf_counter()
+        response = client.post("/api/transfer", json={"receiver_cpf": "22222222222", "amount": 1})
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.get_json()
+    return samples
+
+
+def main(n=2000):
+    hot = hot_path_latencies(n * 25)
+    print(f"is_held + submit: p50 {percentile(hot, .5) * 1e6:.1f} µs  p99 {percentile(hot, .99) * 1e6:.1f} µs")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        orion_app.USERS_FILE = os.path.join(tmp, "users.json")
+        base = transfer_latencies(_NoMonitor(), n)
+        monitor = fraud_service.FraudMonitor(max_transfers_per_minute=10**9)
+        with_monitor = transfer_latencies(monitor, n)
+        monitor.join()
+
+    base_p99 = percentile(base, .99) * 1e3
+    monitor_p99 = percentile(with_monitor, .99) * 1e3
+    added = monitor_p99 - base_p99
+    print(f"/api/transfer sem monitor: p99 {base_p99:.3f} ms")
+    print(f"/api/transfer com monitor: p99 {monitor_p99:.3f} ms")
+    print(f"p99 adicionado: {added:.3f} ms (orçamento {P99_BUDGET_MS} ms) -> "
+          f"{'OK' if added <= P99_BUDGET_MS else 'ACIMA DO ORÇAMENTO'}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Torna os módulos de orion_flask_project importáveis
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root / "orion_flask_project"))
+import export_statements
+import statement_service
+
+
+def make_account(i, n_transactions):
+    """Conta sintética alternando envios e recebimentos, em ordem cronológica."""
+    base = datetime(2024, 1, 1)
+    history = []
+    for j in range(n_transactions):
+        sent = j % 2 == 0
+        t = {
+            "id": f"{i:08x}{j:024x}",
+            "type": "sent" if sent else "received",
+            "amount": float(j % 500) + 0.5,
+            "timestamp": (base + timedelta(minutes=j)).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        if sent:
+            t["recipient_name"] = "Destinatario Sintetico"
+        else:
+            t["sender_name"] = "Remetente Sintetico"
+        history.append(t)
+    return {"nome": f"Conta {i}", "cpf": f"{i:011d}", "balance": 1000.0, "transactions": history}
+
+
+def write_users_file(path, n_accounts, n_transactions):
+    """Grava um users.json grande (indent=4, como o app) uma conta por vez."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for i in range(n_accounts):
+            if i:
+                f.write(",\n")
+            f.write(f'    "u{i:06d}": ')
+            f.write(json.dumps(make_account(i, n_transactions), indent=4))
+        f.write("\n}\n")
+
+
+def run(label, make_chunks, rows):
+    """
+    Consome o gerador sem acumular a saída. O tracemalloc começa antes de
+    make_chunks(), então a leitura do users.json entra no pico de memória.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    for chunk in make_chunks():
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<34} {elapsed:>7.2f} s  {rows / elapsed:>10,.0f} linhas/s  "
+        f"pico {peak / 1024 / 1024:>8,.1f} MiB  saída {size / 1024 / 1024:>8,.1f} MiB"
+    )
+
+
+def load_all(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(n_accounts=200, n_transactions=2500):
+    total = n_accounts * n_transactions
+    with tempfile.TemporaryDirectory() as tmp:
+        users_file = os.path.join(tmp, "users.json")
+        write_users_file(users_file, n_accounts, n_transactions)
+        print(
+            f"users.json sintético: {n_accounts:,} contas x {n_transactions:,} transações "
+            f"({os.path.getsize(users_file) / 1024 / 1024:,.1f} MiB)\n"
+        )
+
+        # Extrato consolidado do admin (/api/admin/statement), ponta a ponta
+        run(
+            "admin csv (leitura incremental)",
+            lambda: statement_service.iter_bulk_csv_statement(statement_service.iter_users_file(users_file)),
+            total,
+        )
+        run(
+            "admin ofx (leitura incremental)",
+            lambda: statement_service.iter_bulk_ofx_statement(statement_service.iter_users_file(users_file)),
+            total,
+        )
+        # Referência: carregar o users.json inteiro antes de gerar
+        run(
+            "admin csv (json.load)",
+            lambda: statement_service.iter_bulk_csv_statement(load_all(users_file)),
+            total,
+        )
+
+        # Extrato de um usuário (/api/statement): a última conta do arquivo
+        last_id = f"u{n_accounts - 1:06d}"
+        run(
+            "usuário csv (find_account)",
+            lambda: statement_service.iter_csv_statement(statement_service.find_account(users_file, last_id)),
+            n_transactions,
+        )
+
+        # CLI: pool de processos, 1 worker contra N workers
+        workers = os.cpu_count() or 4
+        for n in sorted({1, workers}):
+            started = time.perf_counter()
+            export_statements.export_all(users_file, os.path.join(tmp, f"out{n}"), "csv", workers=n)
+            elapsed = time.perf_counter() - started
+            print(f"CLI export_all, {n:>2} processo(s): {elapsed:6.2f} s  ({total / elapsed:,.0f} linhas/s)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
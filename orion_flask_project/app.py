@@ -1,7 +1,13 @@
+import atexit
+import csv
 import json
 import os
+import threading
+import time
 import uuid
+import zipfile
 from urllib.parse import quote_plus
+from collections import Counter
 from functools import wraps
 from datetime import datetime, timedelta
 
@@ -14,9 +20,20 @@ from flask import (
     session,
     jsonify,
     flash,
+    Response,
+    stream_with_context,
+    send_file,
 )
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Permite importar os módulos vizinhos tanto como pacote (testes) quanto via `python app.py`
+try:
+    from . import fraud_service, job_service, statement_service
+except ImportError:
+    import fraud_service
+    import job_service
+    import statement_service
+
 # --- Configuração Inicial do Flask ---
 app = Flask(__name__)
 # Chave secreta obrigatória para sessões e mensagens flash
@@ -43,6 +60,14 @@ GEMINI_SYSTEM_PROMPT = os.environ.get(
 if not GEMINI_SUPPORT_URL:
     GEMINI_SUPPORT_URL = f"{GEMINI_SUPPORT_BASE_URL}?system_prompt={quote_plus(GEMINI_SYSTEM_PROMPT)}"
 
+# Monitor de fraude: analisa as transferências confirmadas em segundo plano
+fraud_monitor = fraud_service.FraudMonitor(holds_file=fraud_service.HOLDS_FILE)
+
+# Executor de jobs administrativos pesados (os handlers são registrados mais abaixo).
+# Os workers só são criados no primeiro job; ao encerrar, os jobs são cancelados.
+job_runner = job_service.JobRunner()
+atexit.register(job_runner.shutdown, timeout=5)
+
 
 # --- Funções de Manipulação de Dados (Simulação de DB) ---
 
@@ -59,9 +84,15 @@ def load_users():
 
 
 def save_users(users_data):
-    """Salva dados dos usuários no arquivo JSON."""
-    with open(USERS_FILE, "w") as f:
+    """
+    Salva dados dos usuários no arquivo JSON. A gravação vai para um arquivo
+    temporário que substitui o original, então um extrato sendo lido em
+    streaming continua vendo a versão completa que abriu.
+    """
+    tmp_file = USERS_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
         json.dump(users_data, f, indent=4)
+    os.replace(tmp_file, USERS_FILE)
 
 
 def get_user_data(user_id):
@@ -377,6 +408,9 @@ def api_transfer():
     if amount <= 0:
         return jsonify({"success": False, "message": "O valor deve ser positivo."}), 400
 
+    if fraud_monitor.is_held(user_id):
+        return jsonify({"success": False, "message": "Conta temporariamente bloqueada para análise de segurança."}), 403
+
     users = load_users()
     sender = users.get(user_id)
     recipient_found = None
@@ -441,6 +475,9 @@ def api_transfer():
         users[user_id] = sender
         users[recipient_key] = recipient_found
         save_users(users)
+
+        # Publica o evento para o monitor de fraude (não bloqueia a resposta)
+        fraud_monitor.submit(user_id, recipient_key, recipient_found.get("cpf"), amount)
         
         return jsonify({
             "success": True, 
@@ -456,14 +493,133 @@ def api_transfer():
         )
 
 
+# Intervalo mínimo (segundos) entre recálculos das estatísticas do dashboard
+STATS_REFRESH_INTERVAL = 10
+_stats_lock = threading.Lock()
+_stats_cache = {"job_id": None, "stats": None, "error": None, "attempted_at": None}
+
+
 @app.route("/api/admin_stats", methods=["GET"])
 @admin_required
 def api_admin_stats():
     """
     NOVA ROTA: API para obter estatísticas do sistema no Dashboard do Admin.
+    Devolve o último resultado do job 'stats' e agenda um novo cálculo quando
+    ele fica desatualizado, sem varrer o users.json dentro da requisição.
+    Se o cálculo falhar, a falha é devolvida e só há nova tentativa depois de
+    STATS_REFRESH_INTERVAL segundos.
     """
-    stats = get_system_stats()
-    return jsonify({"success": True, "stats": stats})
+    with _stats_lock:
+        job = job_runner.get(_stats_cache["job_id"]) if _stats_cache["job_id"] else None
+
+        if job and job["status"] == job_service.DONE:
+            with open(job["result_file"], "r", encoding="utf-8") as f:
+                _stats_cache["stats"] = json.load(f)
+            _stats_cache["error"] = None
+        elif job and job["status"] in (job_service.FAILED, job_service.CANCELLED):
+            _stats_cache["error"] = job["error"] or "Cálculo das estatísticas cancelado."
+        if job and job["status"] in job_service.FINISHED_STATUSES:
+            # Cada recálculo substitui o anterior na tabela de jobs
+            job_runner.delete(job["id"])
+            _stats_cache["job_id"] = job = None
+
+        attempted_at = _stats_cache["attempted_at"]
+        if not job and (attempted_at is None or time.monotonic() - attempted_at >= STATS_REFRESH_INTERVAL):
+            try:
+                _stats_cache["job_id"] = job_runner.submit("stats")["id"]
+            except RuntimeError as e:
+                return jsonify({"success": False, "message": str(e)}), 503
+            _stats_cache["attempted_at"] = time.monotonic()
+
+        stats = _stats_cache["stats"]
+        error = _stats_cache["error"]
+
+    if stats is None and error:
+        return jsonify({"success": False, "message": f"Erro ao calcular estatísticas: {error}"}), 500
+    return jsonify({"success": True, "stats": stats, "pending": stats is None})
+
+
+@app.route("/api/admin/fraud_holds", methods=["GET"])
+@admin_required
+def api_admin_fraud_holds():
+    """API para listar as contas bloqueadas pelo monitor de fraude."""
+    holds = fraud_monitor.holds()
+    return jsonify({
+        "success": True,
+        "holds": [{"account_id": k, "reason": v} for k, v in holds.items()],
+        "dropped_events": fraud_monitor.dropped_events,
+    })
+
+
+@app.route("/api/admin/fraud_holds/release", methods=["POST"])
+@admin_required
+def api_admin_fraud_release():
+    """API para liberar uma conta da lista de bloqueio."""
+    data = request.json or {}
+    account_id = data.get("account_id")
+    if not account_id or not fraud_monitor.release(account_id):
+        return jsonify({"success": False, "message": "Conta não encontrada na lista de bloqueio."}), 404
+    return jsonify({"success": True, "message": "Conta liberada com sucesso."})
+
+
+def _statement_params():
+    """Lê formato e intervalo de datas da query string do extrato."""
+    fmt = request.args.get("format", "csv").lower()
+    if fmt not in statement_service.STATEMENT_FORMATS:
+        raise ValueError("Formato inválido. Use 'csv' ou 'ofx'.")
+    try:
+        start = statement_service.parse_date_filter(request.args.get("start"))
+        end = statement_service.parse_date_filter(request.args.get("end"), end_of_day=True)
+    except ValueError:
+        raise ValueError("Datas inválidas. Use o formato AAAA-MM-DD.")
+    return fmt, start, end
+
+
+def _statement_response(chunks, fmt, filename):
+    """Resposta em streaming: o extrato é enviado à medida que é gerado."""
+    return Response(
+        stream_with_context(chunks),
+        mimetype=statement_service.STATEMENT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{fmt}"},
+    )
+
+
+@app.route("/api/statement", methods=["GET"])
+@login_required
+def api_statement():
+    """API para baixar o extrato do usuário em CSV ou OFX (com filtro de datas)."""
+    user_id = session["user_id"]
+
+    try:
+        fmt, start, end = _statement_params()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    # Lê só a conta do usuário, sem carregar o users.json inteiro
+    try:
+        user = statement_service.find_account(USERS_FILE, user_id)
+    except ValueError:
+        user = None
+    if user_id == "super_admin" or not user:
+        return jsonify({"success": False, "message": "Usuário não autorizado ou não encontrado."}), 404
+
+    chunks = statement_service.iter_statement(fmt, user_id, user, start, end)
+    return _statement_response(chunks, fmt, f"extrato_{user_id}")
+
+
+@app.route("/api/admin/statement", methods=["GET"])
+@admin_required
+def api_admin_statement():
+    """API para o admin baixar o extrato consolidado de todas as contas."""
+    try:
+        fmt, start, end = _statement_params()
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+
+    # As contas são lidas do arquivo uma a uma, à medida que o extrato é enviado
+    users = statement_service.iter_users_file(USERS_FILE)
+    chunks = statement_service.iter_bulk_statement(fmt, users, start, end)
+    return _statement_response(chunks, fmt, "extrato_consolidado")
     
 # Rota para exclusão de conta (mantida)
 @app.route("/api/delete-account", methods=["POST"])
@@ -498,6 +654,141 @@ def api_delete_account():
         return jsonify({"success": False, "message": "Erro interno ao deletar conta."}), 500
 
 
+
+# --- Jobs Administrativos (executados em segundo plano) ---
+
+
+def _job_recompute_stats(ctx):
+    """Job: recalcula as estatísticas completas e grava em JSON."""
+    stats = get_system_stats()
+    ctx.progress(1, 1)
+    path = ctx.result_path("estatisticas.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats, f, ensure_ascii=False, indent=4)
+    return path
+
+
+def _job_export_statements(ctx, fmt="csv", start=None, end=None):
+    """Job: exporta o extrato de cada conta para um arquivo .zip (um arquivo por conta)."""
+    if fmt not in statement_service.STATEMENT_FORMATS:
+        raise ValueError("Formato inválido. Use 'csv' ou 'ofx'.")
+    start = statement_service.parse_date_filter(start)
+    end = statement_service.parse_date_filter(end, end_of_day=True)
+
+    accounts = list(statement_service.iter_statement_accounts(load_users()))
+    path = ctx.result_path(f"extratos_{fmt}.zip")
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for i, (user_id, user_data) in enumerate(accounts, start=1):
+            with archive.open(f"{user_id}.{fmt}", "w") as member:
+                for chunk in statement_service.iter_statement(fmt, user_id, user_data, start, end):
+                    member.write(chunk.encode("utf-8"))
+            ctx.progress(i, len(accounts), f"{i}/{len(accounts)} contas exportadas")
+    return path
+
+
+def _job_reconcile(ctx):
+    """
+    Job: confere se cada transferência enviada tem o recebimento correspondente
+    na conta de destino (mesmo valor e horário). Grava as divergências em CSV.
+    """
+    users = load_users()
+    accounts = list(statement_service.iter_statement_accounts(users))
+    total_steps = 2 * len(accounts)
+
+    # 1ª passada: indexa os recebimentos por (destino, remetente, valor, horário)
+    received = Counter()
+    for i, (user_id, user_data) in enumerate(accounts, start=1):
+        for t in statement_service.iter_transactions(user_data):
+            if t.get("type") == "received":
+                received[(user_id, t.get("sender_id"), t.get("amount"), t.get("timestamp"))] += 1
+        ctx.progress(i, total_steps, f"{i}/{len(accounts)} contas indexadas")
+
+    # 2ª passada: cada envio consome um recebimento correspondente
+    path = ctx.result_path("reconciliacao.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["conta", "transacao", "contraparte", "valor", "data", "problema"])
+        for i, (user_id, user_data) in enumerate(accounts, start=1):
+            for t in statement_service.iter_transactions(user_data):
+                if t.get("type") != "sent":
+                    continue
+                recipient_id = t.get("recipient_id")
+                key = (recipient_id, user_id, t.get("amount"), t.get("timestamp"))
+                if recipient_id not in users:
+                    problem = "Conta de destino inexistente"
+                elif received[key] > 0:
+                    received[key] -= 1
+                    continue
+                else:
+                    problem = "Recebimento correspondente não encontrado"
+                writer.writerow([user_id, t.get("id"), recipient_id, t.get("amount"), t.get("timestamp"), problem])
+            ctx.progress(len(accounts) + i, total_steps, f"{i}/{len(accounts)} contas conferidas")
+    return path
+
+
+job_runner.register("stats", _job_recompute_stats)
+job_runner.register("export_statements", _job_export_statements)
+job_runner.register("reconcile", _job_reconcile)
+
+
+@app.route("/api/admin/jobs", methods=["GET"])
+@admin_required
+def api_admin_jobs():
+    """API para listar os jobs administrativos."""
+    return jsonify({"success": True, "jobs": job_runner.list_jobs(), "job_types": job_runner.job_types()})
+
+
+@app.route("/api/admin/jobs", methods=["POST"])
+@admin_required
+def api_admin_submit_job():
+    """API para enviar um job. Retorna imediatamente com o ID para consulta."""
+    data = request.json or {}
+    if not isinstance(data, dict) or not isinstance(data.get("type"), str):
+        return jsonify({"success": False, "message": "Informe o tipo do job."}), 400
+    params = data.get("params") or {}
+    if not isinstance(params, dict):
+        return jsonify({"success": False, "message": "Parâmetros do job inválidos."}), 400
+    # Mesma chave 'format' da query string dos extratos
+    if "format" in params:
+        params["fmt"] = params.pop("format")
+    try:
+        job = job_runner.submit(data["type"], params)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"success": False, "message": str(e)}), 503
+    return jsonify({"success": True, "job": job}), 202
+
+
+@app.route("/api/admin/jobs/<job_id>", methods=["GET"])
+@admin_required
+def api_admin_job_status(job_id):
+    """API para consultar o status e o progresso de um job."""
+    job = job_runner.get(job_id)
+    if not job:
+        return jsonify({"success": False, "message": "Job não encontrado."}), 404
+    return jsonify({"success": True, "job": job})
+
+
+@app.route("/api/admin/jobs/<job_id>/cancel", methods=["POST"])
+@admin_required
+def api_admin_cancel_job(job_id):
+    """API para cancelar um job pendente ou em execução."""
+    if not job_runner.cancel(job_id):
+        return jsonify({"success": False, "message": "Job não encontrado ou já finalizado."}), 404
+    return jsonify({"success": True, "message": "Cancelamento solicitado."})
+
+
+@app.route("/api/admin/jobs/<job_id>/result", methods=["GET"])
+@admin_required
+def api_admin_job_result(job_id):
+    """API para baixar o arquivo de resultado de um job concluído."""
+    path = job_runner.result_file(job_id)
+    if not path or not os.path.exists(path):
+        return jsonify({"success": False, "message": "Resultado indisponível."}), 404
+    return send_file(os.path.abspath(path), as_attachment=True)
+
+
 # Certifique-se que esta linha está no final do seu arquivo
 if __name__ == '__main__':
     # Inicialização do super admin se não existir
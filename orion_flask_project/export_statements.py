@@ -0,0 +1,74 @@
+import argparse
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import statement_service
+
+# ----------------------------------------------------------------------
+# CLI do Admin: exporta o extrato de TODAS as contas, um arquivo por conta
+# ----------------------------------------------------------------------
+#
+# Uso:
+#   python export_statements.py --format ofx --start 2025-01-01 --end 2025-12-31 \
+#       --output-dir extratos --workers 8
+
+USERS_FILE = "users.json"
+
+
+def export_all(users_file, output_dir, fmt="csv", start=None, end=None, workers=4):
+    """
+    Exporta o extrato de cada conta para `output_dir/<conta>.<fmt>`.
+
+    Gerar o extrato é CPU-bound, então cada conta vai para um processo do
+    pool. As contas são lidas do arquivo uma a uma e no máximo 2 * workers
+    ficam em trânsito, de modo que a memória não cresce com o tamanho do
+    users.json. Retorna a lista de caminhos gerados.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    in_flight = set()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        accounts = statement_service.iter_statement_accounts(
+            statement_service.iter_users_file(users_file)
+        )
+        for user_id, user_data in accounts:
+            if len(in_flight) >= 2 * workers:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                paths.extend(future.result() for future in done)
+            in_flight.add(executor.submit(
+                statement_service.write_statement,
+                os.path.join(output_dir, f"{user_id}.{fmt}"),
+                fmt,
+                user_id,
+                user_data,
+                start,
+                end,
+            ))
+        paths.extend(future.result() for future in in_flight)
+
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta os extratos de todas as contas do Orion.")
+    parser.add_argument("--users-file", default=USERS_FILE, help="Arquivo JSON de usuários.")
+    parser.add_argument("--format", choices=sorted(statement_service.STATEMENT_FORMATS), default="csv")
+    parser.add_argument("--start", help="Data inicial (AAAA-MM-DD).")
+    parser.add_argument("--end", help="Data final (AAAA-MM-DD).")
+    parser.add_argument("--output-dir", default="extratos", help="Diretório de saída.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4, help="Processos simultâneos.")
+    args = parser.parse_args(argv)
+
+    try:
+        start = statement_service.parse_date_filter(args.start)
+        end = statement_service.parse_date_filter(args.end, end_of_day=True)
+    except ValueError:
+        parser.error("Datas inválidas. Use o formato AAAA-MM-DD.")
+
+    paths = export_all(args.users_file, args.output_dir, args.format, start, end, args.workers)
+    print(f"✅ {len(paths)} extrato(s) exportado(s) para '{args.output_dir}'.")
+
+
+if __name__ == "__main__":
+    main()
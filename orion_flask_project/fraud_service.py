@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# ----------------------------------------------------------------------
+# Monitoramento de Fraude e Velocidade (fora do caminho da transferência)
+# ----------------------------------------------------------------------
+#
+# A rota de transferência apenas publica o evento já confirmado numa fila
+# limitada e consulta a lista de bloqueio (um único lookup em um dict).
+# Toda a análise acontece numa thread em segundo plano, com contadores de
+# janela deslizante de tamanho fixo por conta. A lista de bloqueio é gravada
+# em HOLDS_FILE para sobreviver a reinicializações do servidor.
+
+HOLDS_FILE = "fraud_holds.json"
+
+# Regras padrão (podem ser sobrescritas no construtor do FraudMonitor)
+MAX_TRANSFERS_PER_MINUTE = 10          # transferências enviadas por minuto
+MAX_NEW_RECIPIENTS_PER_WINDOW = 5      # destinatários novos em NEW_RECIPIENT_WINDOW
+NEW_RECIPIENT_WINDOW = 300             # segundos
+MAX_FANOUT_RECIPIENTS = 8              # CPFs distintos em FANOUT_WINDOW
+FANOUT_WINDOW = 600                    # segundos
+MAX_RECEIVED_PER_MINUTE = 30           # recebimentos por minuto (contas "laranja")
+RECENT_RECIPIENTS_SIZE = 32            # destinatários lembrados por remetente
+IDLE_TTL = 3600                        # segundos sem atividade até descartar a conta
+MAX_TRACKED_ACCOUNTS = 100000
+QUEUE_SIZE = 10000
+
+logger = logging.getLogger(__name__)
+
+TransferEvent = namedtuple(
+    "TransferEvent", ["sender_id", "recipient_id", "recipient_cpf", "amount", "at"]
+)
+
+
+class SlidingWindowCounter:
+    """
+    Contador de janela deslizante com memória fixa: a janela é dividida em
+    `buckets` fatias, e cada fatia guarda a contagem e o período a que pertence.
+    """
+
+    __slots__ = ("bucket_seconds", "counts", "epochs")
+
+    def __init__(self, window_seconds, buckets=6):
+        self.bucket_seconds = window_seconds / buckets
+        self.counts = [0] * buckets
+        self.epochs = [-1] * buckets
+
+    def add(self, now, amount=1):
+        epoch = int(now // self.bucket_seconds)
+        i = epoch % len(self.counts)
+        if self.epochs[i] != epoch:
+            self.epochs[i] = epoch
+            self.counts[i] = 0
+        self.counts[i] += amount
+        return self.total(now)
+
+    def total(self, now):
+        oldest = int(now // self.bucket_seconds) - len(self.counts) + 1
+        return sum(c for c, e in zip(self.counts, self.epochs) if e >= oldest)
+
+
+class _AccountState:
+    """Estado de velocidade de uma conta (tamanho constante)."""
+
+    __slots__ = ("sent", "received", "new_recipients", "recent_recipients", "last_seen")
+
+    def __init__(self):
+        self.sent = SlidingWindowCounter(60)
+        self.received = SlidingWindowCounter(60)
+        self.new_recipients = SlidingWindowCounter(NEW_RECIPIENT_WINDOW)
+        # CPF -> último envio; limitado a RECENT_RECIPIENTS_SIZE entradas (LRU)
+        self.recent_recipients = OrderedDict()
+        self.last_seen = 0.0
+
+
+class FraudMonitor:
+    """Pipeline assíncrono de regras de velocidade e anomalia."""
+
+    def __init__(
+        self,
+        max_transfers_per_minute=MAX_TRANSFERS_PER_MINUTE,
+        max_new_recipients=MAX_NEW_RECIPIENTS_PER_WINDOW,
+        max_fanout=MAX_FANOUT_RECIPIENTS,
+        max_received_per_minute=MAX_RECEIVED_PER_MINUTE,
+        idle_ttl=IDLE_TTL,
+        max_accounts=MAX_TRACKED_ACCOUNTS,
+        queue_size=QUEUE_SIZE,
+        clock=time.monotonic,
+        holds_file=None,
+    ):
+        self.max_transfers_per_minute = max_transfers_per_minute
+        self.max_new_recipients = max_new_recipients
+        self.max_fanout = max_fanout
+        self.max_received_per_minute = max_received_per_minute
+        self.idle_ttl = idle_ttl
+        self.max_accounts = max_accounts
+        self.clock = clock
+        self.holds_file = holds_file
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        # Contas ordenadas da menos para a mais recentemente ativa
+        self._accounts = OrderedDict()
+        # Lista de bloqueio: conta -> motivo
+        self._holds = self._load_holds()
+        self._lock = threading.Lock()
+        self._worker = None
+        self.dropped_events = 0
+
+    # --- Caminho da transferência (deve ser O(1) e nunca bloquear) ---
+
+    def is_held(self, account_id):
+        """Verifica se a conta está bloqueada para análise."""
+        return account_id in self._holds
+
+    def submit(self, sender_id, recipient_id, recipient_cpf, amount):
+        """
+        Publica uma transferência confirmada. Se a fila estiver cheia o evento
+        é descartado (e contabilizado) em vez de atrasar a transferência.
+        """
+        self._ensure_started()
+        event = TransferEvent(sender_id, recipient_id, recipient_cpf, amount, self.clock())
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self.dropped_events += 1
+
+    # --- Lista de bloqueio (consultada/gerenciada pelo admin) ---
+
+    def holds(self):
+        with self._lock:
+            return dict(self._holds)
+
+    def hold(self, account_id, reason):
+        with self._lock:
+            if account_id not in self._holds:
+                self._holds[account_id] = reason
+                self._save_holds()
+
+    def release(self, account_id):
+        """Remove a conta da lista de bloqueio. Retorna False se ela não estava bloqueada."""
+        with self._lock:
+            if self._holds.pop(account_id, None) is None:
+                return False
+            self._save_holds()
+            return True
+
+    def _load_holds(self):
+        """Carrega a lista de bloqueio gravada (vazia se não houver arquivo)."""
+        if not self.holds_file or not os.path.exists(self.holds_file):
+            return {}
+        try:
+            with open(self.holds_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            logger.exception("Falha ao ler a lista de bloqueio %s", self.holds_file)
+            return {}
+
+    def _save_holds(self):
+        """Grava a lista de bloqueio (deve ser chamada com self._lock adquirido)."""
+        if not self.holds_file:
+            return
+        tmp_file = self.holds_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self._holds, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_file, self.holds_file)
+
+    def tracked_accounts(self):
+        return len(self._accounts)
+
+    # --- Thread de análise ---
+
+    def _ensure_started(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="fraud-monitor", daemon=True
+                    )
+                    self._worker.start()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            try:
+                self.process(event)
+            except Exception:
+                logger.exception("Falha ao analisar transferência %s", event)
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """Aguarda a análise de todos os eventos já publicados."""
+        self._queue.join()
+
+    def _state(self, account_id, now):
+        state = self._accounts.get(account_id)
+        if state is None:
+            state = self._accounts[account_id] = _AccountState()
+        else:
+            self._accounts.move_to_end(account_id)
+        state.last_seen = now
+        return state
+
+    def _evict_idle(self, now):
+        """Descarta as contas ociosas (ou excedentes) a partir da menos recente."""
+        while self._accounts:
+            account_id, state = next(iter(self._accounts.items()))
+            if now - state.last_seen < self.idle_ttl and len(self._accounts) <= self.max_accounts:
+                break
+            self._accounts.popitem(last=False)
+
+    def process(self, event):
+        """Aplica as regras a um evento (executado pela thread de análise)."""
+        now = event.at
+        sender = self._state(event.sender_id, now)
+        recipient = self._state(event.recipient_id, now)
+
+        if sender.sent.add(now) > self.max_transfers_per_minute:
+            self.hold(event.sender_id, "Excesso de transferências por minuto.")
+
+        recent = sender.recent_recipients
+        if event.recipient_cpf not in recent:
+            if sender.new_recipients.add(now) > self.max_new_recipients:
+                self.hold(event.sender_id, "Muitos destinatários novos em pouco tempo.")
+        recent[event.recipient_cpf] = now
+        recent.move_to_end(event.recipient_cpf)
+        if len(recent) > RECENT_RECIPIENTS_SIZE:
+            recent.popitem(last=False)
+
+        fanout = sum(1 for seen in recent.values() if now - seen <= FANOUT_WINDOW)
+        if fanout > self.max_fanout:
+            self.hold(event.sender_id, "Transferências para muitos CPFs distintos.")
+
+        if recipient.received.add(now) > self.max_received_per_minute:
+            self.hold(event.recipient_id, "Excesso de recebimentos por minuto.")
+
+        self._evict_idle(now)
@@ -0,0 +1,331 @@
+import inspect
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# ----------------------------------------------------------------------
+# Executor de Jobs em Segundo Plano (sem broker externo)
+# ----------------------------------------------------------------------
+#
+# Operações administrativas pesadas são enviadas como jobs: a rota apenas
+# registra o job e devolve o ID, e um pool de threads daemon (iniciado no
+# primeiro envio) o executa, sem impedir o encerramento do servidor. O estado
+# de cada job fica em JOBS_FILE (a "tabela de jobs" no armazenamento local)
+# e os arquivos de resultado em JOB_RESULTS_DIR/<job_id>/.
+
+JOBS_FILE = "jobs.json"
+JOB_RESULTS_DIR = "job_results"
+JOB_WORKERS = int(os.environ.get("ORION_JOB_WORKERS", "2"))
+# Quantos jobs encerrados ficam na tabela (os mais antigos são removidos)
+MAX_FINISHED_JOBS = int(os.environ.get("ORION_MAX_FINISHED_JOBS", "100"))
+# Intervalo mínimo (segundos) entre gravações de progresso em disco
+PROGRESS_SAVE_INTERVAL = 1.0
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Lançada dentro do job quando o admin solicita o cancelamento."""
+
+
+class JobContext:
+    """Interface entregue a cada job para reportar progresso e checar cancelamento."""
+
+    def __init__(self, runner, job_id):
+        self._runner = runner
+        self.job_id = job_id
+        self._cancel_event = threading.Event()
+
+    def progress(self, done, total, message=None):
+        """Atualiza o progresso (0-100) e verifica se o job foi cancelado."""
+        self.check_cancelled()
+        percent = 100 if not total else int(done * 100 / total)
+        self._runner._update_progress(self.job_id, percent, message)
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    def result_path(self, filename):
+        """Caminho para gravar um arquivo de resultado deste job."""
+        directory = os.path.join(self._runner.results_dir, self.job_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, filename)
+
+
+class JobRunner:
+    """Pool de workers com tabela de jobs persistida em JSON."""
+
+    def __init__(
+        self,
+        jobs_file=JOBS_FILE,
+        results_dir=JOB_RESULTS_DIR,
+        max_workers=JOB_WORKERS,
+        max_finished=MAX_FINISHED_JOBS,
+    ):
+        self.jobs_file = jobs_file
+        self.results_dir = results_dir
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._queue = queue.Queue()
+        self._workers = []
+        self._closed = False
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._contexts = {}
+        self._last_save = 0.0
+        self._jobs = self._load_jobs()
+
+    # --- Persistência da tabela de jobs ---
+
+    def _load_jobs(self):
+        """
+        Carrega a tabela de jobs. Jobs que estavam pendentes ou em execução
+        quando o servidor parou são marcados como falhos e perdem os
+        resultados parciais.
+        """
+        if not os.path.exists(self.jobs_file):
+            return {}
+        try:
+            with open(self.jobs_file, "r", encoding="utf-8") as f:
+                jobs = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+        for job in jobs.values():
+            if job["status"] not in FINISHED_STATUSES:
+                job["status"] = FAILED
+                job["error"] = "Interrompido pela reinicialização do servidor."
+                job["finished_at"] = _now()
+                job["result_file"] = None
+                self._remove_results(job["id"])
+        return jobs
+
+    def _save_jobs(self):
+        """Grava a tabela de jobs (deve ser chamada com self._lock adquirido)."""
+        tmp_file = self.jobs_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self._jobs, f, ensure_ascii=False, indent=4)
+        os.replace(tmp_file, self.jobs_file)
+        self._last_save = time.monotonic()
+
+    # --- API pública ---
+
+    def register(self, job_type, handler):
+        """Registra um tipo de job. O handler recebe (ctx, **params) e pode retornar o caminho do resultado."""
+        self._handlers[job_type] = handler
+
+    def job_types(self):
+        return sorted(self._handlers)
+
+    def submit(self, job_type, params=None):
+        """
+        Cria o job na tabela e o agenda no pool. Lança ValueError se o tipo for
+        desconhecido ou se os parâmetros não servirem para o handler.
+        """
+        if not isinstance(job_type, str) or job_type not in self._handlers:
+            raise ValueError(f"Tipo de job desconhecido: {job_type}")
+        try:
+            inspect.signature(self._handlers[job_type]).bind(None, **(params or {}))
+        except TypeError:
+            raise ValueError(f"Parâmetros inválidos para o job {job_type}.")
+        if self._closed:
+            raise RuntimeError("O executor de jobs foi encerrado.")
+        self._ensure_started()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "type": job_type,
+            "params": params or {},
+            "status": PENDING,
+            "progress": 0,
+            "message": None,
+            "error": None,
+            "result_file": None,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._contexts[job_id] = JobContext(self, job_id)
+            self._save_jobs()
+        self._queue.put(job_id)
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self):
+        """Jobs do mais recente para o mais antigo."""
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()]
+        return sorted(jobs, key=lambda j: j["created_at"], reverse=True)
+
+    def cancel(self, job_id):
+        """
+        Cancela um job. Pendentes são cancelados na hora; em execução param
+        na próxima chamada de progress()/check_cancelled().
+        Retorna False se o job não existe ou já terminou.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] in FINISHED_STATUSES:
+                return False
+            self._contexts[job_id]._cancel_event.set()
+            if job["status"] == PENDING:
+                # O worker ignora o job ao retirá-lo da fila
+                self._finish(job, CANCELLED)
+        return True
+
+    def delete(self, job_id):
+        """Remove um job encerrado da tabela, junto com seus arquivos de resultado."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] not in FINISHED_STATUSES:
+                return False
+            del self._jobs[job_id]
+            self._save_jobs()
+        self._remove_results(job_id)
+        return True
+
+    def result_file(self, job_id):
+        """Caminho do arquivo de resultado de um job concluído (ou None)."""
+        job = self.get(job_id)
+        if not job or job["status"] != DONE or not job["result_file"]:
+            return None
+        return job["result_file"]
+
+    def join(self):
+        """Aguarda a execução de todos os jobs já enviados."""
+        self._queue.join()
+
+    def shutdown(self, wait=True, timeout=None):
+        """
+        Cancela os jobs pendentes e em execução e encerra os workers. Com
+        `wait`, aguarda (até `timeout` segundos) os jobs em execução pararem.
+        """
+        with self._lock:
+            self._closed = True
+            for job_id, ctx in list(self._contexts.items()):
+                ctx._cancel_event.set()
+                job = self._jobs[job_id]
+                if job["status"] == PENDING:
+                    self._finish(job, CANCELLED)
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for worker in workers:
+                worker.join(None if deadline is None else max(0, deadline - time.monotonic()))
+
+    # --- Workers ---
+
+    def _ensure_started(self):
+        if not self._workers:
+            with self._lock:
+                if not self._workers:
+                    for i in range(self.max_workers):
+                        worker = threading.Thread(
+                            target=self._worker_loop, name=f"orion-job-{i}", daemon=True
+                        )
+                        worker.start()
+                        self._workers.append(worker)
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                if job_id is None:
+                    return
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    # --- Execução ---
+
+    def _finish(self, job, status, error=None):
+        """Marca o job como encerrado (deve ser chamada com self._lock adquirido)."""
+        job["status"] = status
+        job["error"] = error
+        job["finished_at"] = _now()
+        if status == DONE:
+            job["progress"] = 100
+        else:
+            # Resultado parcial (ex.: zip pela metade) não deve ficar em disco
+            job["result_file"] = None
+            self._remove_results(job["id"])
+        self._contexts.pop(job["id"], None)
+        self._prune_finished(keep=job["id"])
+        self._save_jobs()
+
+    def _remove_results(self, job_id):
+        shutil.rmtree(os.path.join(self.results_dir, job_id), ignore_errors=True)
+
+    def _prune_finished(self, keep=None):
+        """
+        Mantém no máximo `max_finished` jobs encerrados, removendo os mais
+        antigos e seus resultados (deve ser chamada com self._lock adquirido).
+        """
+        finished = [
+            j for j in self._jobs.values()
+            if j["status"] in FINISHED_STATUSES and j["id"] != keep
+        ]
+        excess = len(finished) + (keep is not None) - self.max_finished
+        if excess <= 0:
+            return
+        finished.sort(key=lambda j: (j["finished_at"] or "", j["created_at"]))
+        for job in finished[:excess]:
+            del self._jobs[job["id"]]
+            self._remove_results(job["id"])
+
+    def _update_progress(self, job_id, percent, message):
+        with self._lock:
+            job = self._jobs[job_id]
+            job["progress"] = percent
+            if message is not None:
+                job["message"] = message
+            if time.monotonic() - self._last_save >= PROGRESS_SAVE_INTERVAL:
+                self._save_jobs()
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job or job["status"] != PENDING:
+                return  # cancelado (ou removido) antes de começar
+            ctx = self._contexts[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = _now()
+            self._save_jobs()
+
+        try:
+            ctx.check_cancelled()
+            result = self._handlers[job["type"]](ctx, **job["params"])
+        except JobCancelled:
+            with self._lock:
+                self._finish(job, CANCELLED)
+        except Exception as e:
+            with self._lock:
+                self._finish(job, FAILED, str(e))
+        else:
+            with self._lock:
+                job["result_file"] = result
+                self._finish(job, DONE)
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
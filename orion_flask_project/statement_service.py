@@ -0,0 +1,357 @@
+import csv
+import json
+import os
+from datetime import datetime
+
+# ----------------------------------------------------------------------
+# Extratos de Conta (CSV / OFX) gerados em streaming
+# ----------------------------------------------------------------------
+#
+# Todas as funções de extrato são geradores: produzem uma linha (ou um
+# bloco pequeno) por vez, de modo que a memória usada para montar a resposta
+# não cresce com o tamanho do histórico da conta. As contas são lidas do
+# users.json uma de cada vez (iter_users_file), então o pico de memória
+# acompanha a maior conta, e não o arquivo inteiro.
+
+DATE_FORMAT = "%Y-%m-%d"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+CSV_HEADER = ["data", "tipo", "valor", "contraparte", "id"]
+BULK_CSV_HEADER = ["conta", "nome", "cpf"] + CSV_HEADER
+
+# Prefixos que planilhas interpretam como fórmula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Tamanho (caracteres) de cada leitura do users.json
+USERS_READ_CHUNK = 1024 * 1024
+
+STATEMENT_FORMATS = {
+    "csv": "text/csv",
+    "ofx": "application/x-ofx",
+}
+
+
+class _EchoBuffer:
+    """Buffer mínimo para o csv.writer: devolve a linha em vez de acumulá-la."""
+
+    def write(self, value):
+        return value
+
+
+_csv_writer = csv.writer(_EchoBuffer())
+
+
+# ----------------------------------------------------------------------
+# Leitura incremental do users.json
+# ----------------------------------------------------------------------
+
+class _ObjectStreamReader:
+    """
+    Lê as entradas de um objeto JSON de primeiro nível (`{"id": {...}, ...}`)
+    com json.JSONDecoder.raw_decode sobre um buffer, sem carregar o arquivo.
+    """
+
+    def __init__(self, f, chunk_size):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        """Descarta o que já foi lido e acrescenta mais dados ao buffer."""
+        # Lê ao menos o tamanho do que está pendente: o buffer dobra a cada
+        # tentativa e decodificar uma conta grande continua linear.
+        data = self._f.read(max(self._chunk_size, len(self._buf) - self._pos))
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        self._eof = not data
+
+    def _peek(self):
+        """Próximo caractere que não seja espaço ('' no fim do arquivo)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf) or self._eof:
+                return self._buf[self._pos:self._pos + 1]
+            self._fill()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"users.json inválido: esperado '{char}'.")
+        self._pos += 1
+
+    def _decode(self):
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            else:
+                # Um valor que termina no fim do buffer pode estar incompleto
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            self._fill()
+
+    def __iter__(self):
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            self._peek()
+            key = self._decode()
+            self._expect(":")
+            self._peek()
+            yield key, self._decode()
+            if self._peek() == ",":
+                self._pos += 1
+                continue
+            self._expect("}")
+            return
+
+
+def iter_users_file(path, chunk_size=USERS_READ_CHUNK):
+    """
+    Percorre (user_id, user_data) do arquivo de usuários, uma conta por vez.
+    Um arquivo inexistente ou vazio não tem contas, como no load_users().
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        reader = _ObjectStreamReader(f, chunk_size)
+        if reader._peek() == "":
+            return
+        yield from reader
+
+
+def find_account(path, user_id):
+    """Busca uma única conta no arquivo de usuários sem carregar as demais."""
+    for key, user_data in iter_users_file(path):
+        if key == user_id:
+            return user_data
+    return None
+
+
+def parse_date_filter(value, end_of_day=False):
+    """
+    Converte um filtro de data 'YYYY-MM-DD' para o mesmo formato de texto
+    usado nos timestamps das transações, permitindo comparação direta.
+    Retorna None se o filtro não foi informado e lança ValueError se inválido.
+    """
+    if not value:
+        return None
+    day = datetime.strptime(value, DATE_FORMAT)
+    suffix = " 23:59:59" if end_of_day else " 00:00:00"
+    return day.strftime(DATE_FORMAT) + suffix
+
+
+def _balance_of(user_data):
+    """Saldo da conta, com flexibilidade nas chaves 'balance'/'saldo'."""
+    balance_key = "balance" if "balance" in user_data else "saldo"
+    return user_data.get(balance_key, 0.0)
+
+
+def _transactions_of(user_data):
+    """Histórico da conta, com flexibilidade nas chaves 'transactions'/'historico'."""
+    transactions_key = "transactions" if "transactions" in user_data else "historico"
+    return user_data.get(transactions_key, [])
+
+
+def iter_transactions(user_data, start=None, end=None):
+    """
+    Percorre o histórico da conta aplicando o intervalo de datas.
+    Os timestamps seguem o formato 'YYYY-MM-DD HH:MM:SS', então a comparação
+    de strings é suficiente e evita converter cada transação para datetime.
+    """
+    for t in _transactions_of(user_data):
+        timestamp = t.get("timestamp", "")
+        if start and timestamp < start:
+            continue
+        if end and timestamp > end:
+            continue
+        yield t
+
+
+def iter_statement_accounts(users):
+    """
+    Percorre as contas de usuários comuns (ignora o super_admin). Aceita o
+    dicionário de usuários ou os pares de iter_users_file().
+    """
+    items = users.items() if isinstance(users, dict) else users
+    for user_id, user_data in items:
+        if user_id == "super_admin" or user_data.get("is_admin") is True:
+            continue
+        yield user_id, user_data
+
+
+def _counterparty(t):
+    if t.get("type") == "sent":
+        return t.get("recipient_name", "N/A")
+    return t.get("sender_name", "N/A")
+
+
+def _signed_amount(t):
+    """Débitos ('sent') saem negativos no extrato, créditos positivos."""
+    amount = float(t.get("amount", 0.0))
+    return -amount if t.get("type") == "sent" else amount
+
+
+def _csv_text(value):
+    """
+    Neutraliza textos informados pelo usuário (nome, contraparte) que seriam
+    executados como fórmula ao abrir o CSV numa planilha.
+    """
+    value = str(value)
+    if value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_row(t):
+    return [
+        t.get("timestamp", ""),
+        t.get("type", ""),
+        f"{_signed_amount(t):.2f}",
+        _csv_text(_counterparty(t)),
+        t.get("id", ""),
+    ]
+
+
+# ----------------------------------------------------------------------
+# CSV
+# ----------------------------------------------------------------------
+
+def iter_csv_statement(user_data, start=None, end=None):
+    """Gera o extrato CSV de uma conta, uma linha por vez."""
+    yield _csv_writer.writerow(CSV_HEADER)
+    for t in iter_transactions(user_data, start, end):
+        yield _csv_writer.writerow(_csv_row(t))
+
+
+def iter_bulk_csv_statement(users, start=None, end=None):
+    """Gera um único CSV com o extrato de todas as contas (visão do admin)."""
+    yield _csv_writer.writerow(BULK_CSV_HEADER)
+    for user_id, user_data in iter_statement_accounts(users):
+        prefix = [
+            user_id,
+            _csv_text(user_data.get("nome", "N/A")),
+            _csv_text(user_data.get("cpf", "N/A")),
+        ]
+        for t in iter_transactions(user_data, start, end):
+            yield _csv_writer.writerow(prefix + _csv_row(t))
+
+
+# ----------------------------------------------------------------------
+# OFX (formato 2.x / XML)
+# ----------------------------------------------------------------------
+
+OFX_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<?OFX OFXHEADER="200" VERSION="220" SECURITY="NONE" OLDFILEUID="NONE" NEWFILEUID="NONE"?>\n'
+    "<OFX>\n"
+    "<SIGNONMSGSRSV1><SONRS>"
+    "<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>"
+    "<DTSERVER>{now}</DTSERVER><LANGUAGE>POR</LANGUAGE>"
+    "</SONRS></SIGNONMSGSRSV1>\n"
+    "<BANKMSGSRSV1>\n"
+)
+OFX_FOOTER = "</BANKMSGSRSV1>\n</OFX>\n"
+
+
+def _ofx_escape(value):
+    return (
+        str(value)
+        .replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace(">", "&gt;")
+    )
+
+
+def _ofx_datetime(timestamp):
+    """'YYYY-MM-DD HH:MM:SS' -> 'YYYYMMDDHHMMSS' (formato de data do OFX)."""
+    return timestamp.replace("-", "").replace(" ", "").replace(":", "")
+
+
+def _iter_ofx_account(user_id, user_data, start=None, end=None, now=None):
+    """Bloco STMTTRNRS de uma conta, uma transação (STMTTRN) por vez."""
+    now = now or datetime.now().strftime(TIMESTAMP_FORMAT)
+    yield (
+        "<STMTTRNRS><TRNUID>{uid}</TRNUID>"
+        "<STATUS><CODE>0</CODE><SEVERITY>INFO</SEVERITY></STATUS>\n"
+        "<STMTRS><CURDEF>BRL</CURDEF>"
+        "<BANKACCTFROM><BANKID>ORION</BANKID><ACCTID>{acct}</ACCTID>"
+        "<ACCTTYPE>CHECKING</ACCTTYPE></BANKACCTFROM>\n"
+        "<BANKTRANLIST><DTSTART>{dtstart}</DTSTART><DTEND>{dtend}</DTEND>\n"
+    ).format(
+        uid=_ofx_escape(user_id),
+        acct=_ofx_escape(user_data.get("cpf", user_id)),
+        dtstart=_ofx_datetime(start) if start else "19700101000000",
+        dtend=_ofx_datetime(end) if end else _ofx_datetime(now),
+    )
+    for t in iter_transactions(user_data, start, end):
+        yield (
+            "<STMTTRN><TRNTYPE>{trntype}</TRNTYPE><DTPOSTED>{posted}</DTPOSTED>"
+            "<TRNAMT>{amount:.2f}</TRNAMT><FITID>{fitid}</FITID>"
+            "<NAME>{name}</NAME></STMTTRN>\n"
+        ).format(
+            trntype="DEBIT" if t.get("type") == "sent" else "CREDIT",
+            posted=_ofx_datetime(t.get("timestamp", "")),
+            amount=_signed_amount(t),
+            fitid=_ofx_escape(t.get("id", "")),
+            name=_ofx_escape(_counterparty(t)[:32]),
+        )
+    yield (
+        "</BANKTRANLIST>\n"
+        "<LEDGERBAL><BALAMT>{balance:.2f}</BALAMT><DTASOF>{asof}</DTASOF></LEDGERBAL>\n"
+        "</STMTRS></STMTTRNRS>\n"
+    ).format(balance=float(_balance_of(user_data)), asof=_ofx_datetime(now))
+
+
+def iter_ofx_statement(user_id, user_data, start=None, end=None):
+    """Gera o extrato OFX de uma conta."""
+    now = datetime.now().strftime(TIMESTAMP_FORMAT)
+    yield OFX_HEADER.format(now=_ofx_datetime(now))
+    yield from _iter_ofx_account(user_id, user_data, start, end, now)
+    yield OFX_FOOTER
+
+
+def iter_bulk_ofx_statement(users, start=None, end=None):
+    """Gera um único OFX com um bloco STMTTRNRS por conta (visão do admin)."""
+    now = datetime.now().strftime(TIMESTAMP_FORMAT)
+    yield OFX_HEADER.format(now=_ofx_datetime(now))
+    for user_id, user_data in iter_statement_accounts(users):
+        yield from _iter_ofx_account(user_id, user_data, start, end, now)
+    yield OFX_FOOTER
+
+
+# ----------------------------------------------------------------------
+# Pontos de entrada usados pelas rotas e pela CLI
+# ----------------------------------------------------------------------
+
+def iter_statement(fmt, user_id, user_data, start=None, end=None):
+    """Escolhe o gerador de extrato de uma conta conforme o formato."""
+    if fmt == "csv":
+        return iter_csv_statement(user_data, start, end)
+    if fmt == "ofx":
+        return iter_ofx_statement(user_id, user_data, start, end)
+    raise ValueError(f"Formato de extrato inválido: {fmt}")
+
+
+def iter_bulk_statement(fmt, users, start=None, end=None):
+    """Escolhe o gerador de extrato consolidado conforme o formato."""
+    if fmt == "csv":
+        return iter_bulk_csv_statement(users, start, end)
+    if fmt == "ofx":
+        return iter_bulk_ofx_statement(users, start, end)
+    raise ValueError(f"Formato de extrato inválido: {fmt}")
+
+
+def write_statement(path, fmt, user_id, user_data, start=None, end=None):
+    """Grava o extrato de uma conta em disco, bloco a bloco. Retorna o caminho."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for chunk in iter_statement(fmt, user_id, user_data, start, end):
+            f.write(chunk)
+    return path
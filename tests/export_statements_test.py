@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+# Torna os módulos de orion_flask_project importáveis diretamente
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root / "orion_flask_project"))
+import export_statements
+
+
+USERS = {
+    "super_admin": {"email": "admin@orion.com", "cpf": "00000000000", "is_admin": True, "transactions": []},
+    "u1": {
+        "nome": "joao",
+        "cpf": "11122233344",
+        "balance": 900.0,
+        "transactions": [
+            {"id": "a", "type": "sent", "amount": 100.0, "timestamp": "2025-01-10 10:00:00", "recipient_name": "maria"},
+        ],
+    },
+    "u2": {"nome": "maria", "cpf": "55566677788", "balance": 1100.0, "transactions": []},
+}
+
+
+def test_export_all_writes_one_file_per_account():
+    with tempfile.TemporaryDirectory() as tmp:
+        users_file = os.path.join(tmp, "users.json")
+        with open(users_file, "w") as f:
+            json.dump(USERS, f, indent=4)
+        output_dir = os.path.join(tmp, "extratos")
+
+        export_statements.main(["--users-file", users_file, "--output-dir", output_dir, "--workers", "2"])
+
+        assert sorted(os.listdir(output_dir)) == ["u1.csv", "u2.csv"]
+        with open(os.path.join(output_dir, "u1.csv")) as f:
+            assert "-100.00" in f.read()
+
+
+if __name__ == '__main__':
+    test_export_all_writes_one_file_per_account()
+    print('Export tests passed.')
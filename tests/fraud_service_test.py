@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+# Torna os módulos de orion_flask_project importáveis diretamente
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root / "orion_flask_project"))
+from fraud_service import FraudMonitor, SlidingWindowCounter, TransferEvent
+
+
+def test_sliding_window_expires_old_buckets():
+    counter = SlidingWindowCounter(60, buckets=6)
+    counter.add(0)
+    counter.add(5)
+    assert counter.total(30) == 2
+    assert counter.total(125) == 0
+
+
+def test_velocity_rule_holds_sender():
+    monitor = FraudMonitor(max_transfers_per_minute=3)
+    for i in range(4):
+        monitor.process(TransferEvent("s", "r", "111", 10.0, float(i)))
+    assert monitor.is_held("s")
+    assert not monitor.is_held("r")
+    assert monitor.release("s") and not monitor.is_held("s")
+
+
+def test_fanout_rule_holds_sender():
+    monitor = FraudMonitor(max_fanout=3, max_new_recipients=100)
+    for i in range(4):
+        monitor.process(TransferEvent("s", f"r{i}", f"cpf{i}", 10.0, float(i)))
+    assert "CPFs distintos" in monitor.holds()["s"]
+
+
+def test_idle_accounts_are_evicted():
+    monitor = FraudMonitor(idle_ttl=100)
+    monitor.process(TransferEvent("a", "b", "111", 10.0, 0.0))
+    monitor.process(TransferEvent("c", "d", "222", 10.0, 500.0))
+    assert monitor.tracked_accounts() == 2
+
+
+def test_new_recipient_burst_holds_sender():
+    monitor = FraudMonitor(max_new_recipients=2, max_fanout=100)
+    for i in range(3):
+        monitor.process(TransferEvent("s", f"r{i}", f"cpf{i}", 10.0, float(i)))
+    assert "destinatários novos" in monitor.holds()["s"]
+
+
+def test_received_per_minute_holds_recipient():
+    monitor = FraudMonitor(max_received_per_minute=3, max_new_recipients=100, max_fanout=100)
+    for i in range(4):
+        monitor.process(TransferEvent(f"s{i}", "mula", "999", 10.0, float(i)))
+    assert monitor.is_held("mula")
+    assert not any(monitor.is_held(f"s{i}") for i in range(4))
+
+
+def test_tracked_accounts_are_capped():
+    monitor = FraudMonitor(max_accounts=4)
+    for i in range(10):
+        monitor.process(TransferEvent(f"s{i}", f"r{i}", f"cpf{i}", 10.0, float(i)))
+    assert monitor.tracked_accounts() == 4
+
+
+def test_holds_survive_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        holds_file = os.path.join(tmp, "fraud_holds.json")
+        monitor = FraudMonitor(holds_file=holds_file)
+        monitor.hold("a", "motivo")
+        monitor.hold("b", "motivo")
+        monitor.release("b")
+        assert FraudMonitor(holds_file=holds_file).holds() == {"a": "motivo"}
+
+
+if __name__ == '__main__':
+    test_sliding_window_expires_old_buckets()
+    test_velocity_rule_holds_sender()
+    test_fanout_rule_holds_sender()
+    test_idle_accounts_are_evicted()
+    test_new_recipient_burst_holds_sender()
+    test_received_per_minute_holds_recipient()
+    test_tracked_accounts_are_capped()
+    test_holds_survive_restart()
+    print('Fraud monitor tests passed.')
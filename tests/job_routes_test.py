@@ -0,0 +1,165 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+# Ensure repository root is on sys.path so Python finds the package
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+from orion_flask_project import app as orion_app
+from orion_flask_project import job_service
+
+
+USERS = {
+    "super_admin": {"email": "admin@orion.com", "nome": "Admin", "cpf": "00000000000", "is_admin": True},
+    "u1": {
+        "email": "joao@orion.com",
+        "nome": "joao",
+        "cpf": "11122233344",
+        "is_admin": False,
+        "balance": 900.0,
+        "transactions": [
+            {"id": "a", "type": "sent", "amount": 100.0, "timestamp": "2025-01-10 10:00:00",
+             "recipient_name": "maria", "recipient_id": "u2"},
+        ],
+    },
+    "u2": {
+        "email": "maria@orion.com",
+        "nome": "maria",
+        "cpf": "55566677788",
+        "is_admin": False,
+        "balance": 1100.0,
+        "transactions": [],
+    },
+}
+
+
+class AdminApp:
+    """Isola users.json, a tabela de jobs e o cache de estatísticas num diretório temporário."""
+
+    def __init__(self, handlers=None):
+        self.handlers = handlers or {
+            "stats": orion_app._job_recompute_stats,
+            "export_statements": orion_app._job_export_statements,
+            "reconcile": orion_app._job_reconcile,
+        }
+
+    def __enter__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        users_file = os.path.join(self.tmp.name, "users.json")
+        with open(users_file, "w") as f:
+            json.dump(USERS, f)
+        self.runner = job_service.JobRunner(
+            jobs_file=os.path.join(self.tmp.name, "jobs.json"),
+            results_dir=os.path.join(self.tmp.name, "results"),
+            max_workers=1,
+        )
+        for job_type, handler in self.handlers.items():
+            self.runner.register(job_type, handler)
+
+        self.saved = (orion_app.USERS_FILE, orion_app.job_runner, dict(orion_app._stats_cache))
+        orion_app.USERS_FILE, orion_app.job_runner = users_file, self.runner
+        orion_app._stats_cache.update(job_id=None, stats=None, error=None, attempted_at=None)
+
+        self.client = orion_app.app.test_client()
+        with self.client.session_transaction() as s:
+            s["user_id"] = "super_admin"
+        return self
+
+    def __exit__(self, *exc):
+        self.runner.shutdown()
+        orion_app.USERS_FILE, orion_app.job_runner, cache = self.saved
+        orion_app._stats_cache.update(cache)
+        self.tmp.cleanup()
+
+
+def test_export_job_runs_and_result_downloads():
+    with AdminApp() as admin:
+        response = admin.client.post("/api/admin/jobs", json={"type": "export_statements", "params": {"format": "csv"}})
+        assert response.status_code == 202
+        job = response.get_json()["job"]
+        assert job["params"] == {"fmt": "csv"}
+
+        admin.runner.join()
+        status = admin.client.get(f"/api/admin/jobs/{job['id']}").get_json()["job"]
+        assert status["status"] == job_service.DONE and status["progress"] == 100
+
+        result = admin.client.get(f"/api/admin/jobs/{job['id']}/result")
+        assert result.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(result.data)) as archive:
+            assert sorted(archive.namelist()) == ["u1.csv", "u2.csv"]
+        result.close()
+
+        listed = admin.client.get("/api/admin/jobs").get_json()
+        assert [j["id"] for j in listed["jobs"]] == [job["id"]]
+
+
+def test_reconcile_job_reports_missing_receipt():
+    with AdminApp() as admin:
+        job = admin.client.post("/api/admin/jobs", json={"type": "reconcile"}).get_json()["job"]
+        admin.runner.join()
+        result = admin.client.get(f"/api/admin/jobs/{job['id']}/result")
+        rows = result.get_data(as_text=True).splitlines()
+        result.close()
+        assert len(rows) == 2 and "Recebimento correspondente" in rows[1]
+
+
+def test_submit_rejects_bad_requests():
+    with AdminApp() as admin:
+        for body in ({"type": ["x"]}, [1, 2], {"type": "nope"}, {"type": "stats", "params": {"x": 1}},
+                     {"type": "export_statements", "params": ["csv"]}):
+            response = admin.client.post("/api/admin/jobs", json=body)
+            assert response.status_code == 400, body
+
+        admin.runner.shutdown()
+        response = admin.client.post("/api/admin/jobs", json={"type": "stats"})
+        assert response.status_code == 503
+
+
+def test_missing_job_and_unfinished_result_return_404():
+    with AdminApp() as admin:
+        assert admin.client.get("/api/admin/jobs/nada").status_code == 404
+        assert admin.client.post("/api/admin/jobs/nada/cancel").status_code == 404
+        assert admin.client.get("/api/admin/jobs/nada/result").status_code == 404
+
+
+def test_admin_stats_comes_from_job_and_replaces_it():
+    with AdminApp() as admin:
+        first = admin.client.get("/api/admin_stats").get_json()
+        assert first["success"] and first["pending"] and first["stats"] is None
+
+        admin.runner.join()
+        second = admin.client.get("/api/admin_stats").get_json()
+        assert second["stats"]["total_users"] == 2 and not second["pending"]
+        # O job concluído foi consumido e removido; nada novo dentro do intervalo
+        assert admin.runner.list_jobs() == []
+        admin.client.get("/api/admin_stats")
+        assert admin.runner.list_jobs() == []
+
+
+def test_admin_stats_failure_stops_polling():
+    def failing_stats(ctx):
+        raise IOError("users.json ilegível")
+
+    with AdminApp(handlers={"stats": failing_stats}) as admin:
+        assert admin.client.get("/api/admin_stats").get_json()["pending"]
+        admin.runner.join()
+
+        response = admin.client.get("/api/admin_stats")
+        assert response.status_code == 500
+        assert "users.json ilegível" in response.get_json()["message"]
+        # Sem novo job até passar o intervalo de recálculo
+        assert admin.client.get("/api/admin_stats").status_code == 500
+        assert admin.runner.list_jobs() == []
+
+
+if __name__ == '__main__':
+    test_export_job_runs_and_result_downloads()
+    test_reconcile_job_reports_missing_receipt()
+    test_submit_rejects_bad_requests()
+    test_missing_job_and_unfinished_result_return_404()
+    test_admin_stats_comes_from_job_and_replaces_it()
+    test_admin_stats_failure_stops_polling()
+    print('Job route tests passed.')
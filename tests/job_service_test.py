@@ -0,0 +1,175 @@
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+# Torna os módulos de orion_flask_project importáveis diretamente
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root / "orion_flask_project"))
+import job_service
+
+
+def make_runner(tmp, max_workers=1, max_finished=100):
+    return job_service.JobRunner(
+        jobs_file=os.path.join(tmp, "jobs.json"),
+        results_dir=os.path.join(tmp, "results"),
+        max_workers=max_workers,
+        max_finished=max_finished,
+    )
+
+
+def test_job_writes_result_and_persists_status():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+
+        def write_hello(ctx, name):
+            path = ctx.result_path("hello.txt")
+            with open(path, "w") as f:
+                f.write(f"olá {name}")
+            ctx.progress(1, 1)
+            return path
+
+        runner.register("hello", write_hello)
+        job = runner.submit("hello", {"name": "orion"})
+        runner.join()
+        runner.shutdown()
+
+        assert runner.get(job["id"])["status"] == job_service.DONE
+        with open(runner.result_file(job["id"])) as f:
+            assert f.read() == "olá orion"
+        # Uma nova instância lê a mesma tabela de jobs
+        assert make_runner(tmp).get(job["id"])["progress"] == 100
+
+
+def test_running_job_can_be_cancelled():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+        started = threading.Event()
+
+        def loop_forever(ctx):
+            started.set()
+            while True:
+                ctx.progress(0, 1)
+
+        runner.register("loop", loop_forever)
+        job = runner.submit("loop")
+        pending = runner.submit("loop")
+        started.wait(5)
+
+        assert runner.cancel(pending["id"])
+        assert runner.cancel(job["id"])
+        runner.shutdown()
+
+        assert runner.get(job["id"])["status"] == job_service.CANCELLED
+        assert runner.get(pending["id"])["status"] == job_service.CANCELLED
+        assert runner.result_file(job["id"]) is None
+        assert not runner.cancel(job["id"])
+
+
+def test_shutdown_cancels_running_and_pending_jobs():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+        started = threading.Event()
+
+        def loop_forever(ctx):
+            started.set()
+            while True:
+                ctx.progress(0, 1)
+
+        runner.register("loop", loop_forever)
+        running = runner.submit("loop")
+        pending = runner.submit("loop")
+        started.wait(5)
+        runner.shutdown(timeout=5)
+
+        assert runner.get(running["id"])["status"] == job_service.CANCELLED
+        assert runner.get(pending["id"])["status"] == job_service.CANCELLED
+
+
+def test_invalid_params_are_rejected_on_submit():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+        runner.register("hello", lambda ctx, name: name)
+        for params in ({}, {"name": "x", "extra": 1}):
+            try:
+                runner.submit("hello", params)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError(f"params aceitos: {params}")
+        assert runner.list_jobs() == []
+
+
+def test_failed_job_removes_partial_result():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+
+        def half_written(ctx):
+            with open(ctx.result_path("parcial.zip"), "w") as f:
+                f.write("metade")
+            raise IOError("disco cheio")
+
+        runner.register("half", half_written)
+        job = runner.submit("half")
+        runner.join()
+
+        finished = runner.get(job["id"])
+        assert finished["status"] == job_service.FAILED
+        assert finished["error"] == "disco cheio"
+        assert not os.path.exists(os.path.join(tmp, "results", job["id"]))
+
+
+def test_finished_jobs_are_pruned_beyond_limit():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp, max_finished=2)
+
+        def write(ctx, n):
+            path = ctx.result_path("r.txt")
+            with open(path, "w") as f:
+                f.write(str(n))
+            return path
+
+        runner.register("write", write)
+        jobs = []
+        for n in range(4):
+            jobs.append(runner.submit("write", {"n": n}))
+            runner.join()
+
+        assert {j["id"] for j in runner.list_jobs()} == {jobs[2]["id"], jobs[3]["id"]}
+        assert sorted(os.listdir(os.path.join(tmp, "results"))) == sorted([jobs[2]["id"], jobs[3]["id"]])
+
+
+def test_non_string_job_type_is_rejected():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+        try:
+            runner.submit(["x"])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("tipo não-string aceito")
+
+
+def test_unfinished_jobs_fail_after_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        runner = make_runner(tmp)
+        block = threading.Event()
+        runner.register("wait", lambda ctx: block.wait(5))
+        job = runner.submit("wait")
+
+        restarted = make_runner(tmp)
+        block.set()
+        runner.shutdown()
+        assert restarted.get(job["id"])["status"] == job_service.FAILED
+
+
+if __name__ == '__main__':
+    test_job_writes_result_and_persists_status()
+    test_running_job_can_be_cancelled()
+    test_shutdown_cancels_running_and_pending_jobs()
+    test_invalid_params_are_rejected_on_submit()
+    test_failed_job_removes_partial_result()
+    test_finished_jobs_are_pruned_beyond_limit()
+    test_non_string_job_type_is_rejected()
+    test_unfinished_jobs_fail_after_restart()
+    print('Job runner tests passed.')
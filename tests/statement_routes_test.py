@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+# Ensure repository root is on sys.path so Python finds the package
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+from orion_flask_project import app as orion_app
+
+
+USERS = {
+    "super_admin": {"email": "admin@orion.com", "nome": "Admin", "cpf": "00000000000", "is_admin": True},
+    "u1": {
+        "email": "joao@orion.com",
+        "nome": "joao",
+        "cpf": "11122233344",
+        "is_admin": False,
+        "balance": 900.0,
+        "transactions": [
+            {"id": "a", "type": "sent", "amount": 100.0, "timestamp": "2025-01-10 10:00:00", "recipient_name": "maria"},
+            {"id": "b", "type": "received", "amount": 50.0, "timestamp": "2025-02-10 10:00:00", "sender_name": "ana"},
+        ],
+    },
+}
+
+
+def get_as(user_id, url):
+    with tempfile.TemporaryDirectory() as tmp:
+        users_file = os.path.join(tmp, "users.json")
+        with open(users_file, "w") as f:
+            json.dump(USERS, f)
+        old_users_file, orion_app.USERS_FILE = orion_app.USERS_FILE, users_file
+        try:
+            client = orion_app.app.test_client()
+            with client.session_transaction() as s:
+                s["user_id"] = user_id
+            response = client.get(url)
+            return response.status_code, response.get_data(as_text=True)
+        finally:
+            orion_app.USERS_FILE = old_users_file
+
+
+def test_user_statement_route_streams_csv():
+    status, body = get_as("u1", "/api/statement?format=csv&start=2025-02-01")
+    assert status == 200
+    rows = list(csv.reader(io.StringIO(body)))
+    assert rows[0] == ["data", "tipo", "valor", "contraparte", "id"]
+    assert [r[4] for r in rows[1:]] == ["b"]
+
+
+def test_admin_statement_route_streams_csv():
+    status, body = get_as("super_admin", "/api/admin/statement?format=csv")
+    assert status == 200
+    rows = list(csv.reader(io.StringIO(body)))
+    assert [(r[0], r[-1]) for r in rows[1:]] == [("u1", "a"), ("u1", "b")]
+
+
+def test_statement_route_rejects_bad_dates():
+    status, _ = get_as("u1", "/api/statement?start=10/01/2025")
+    assert status == 400
+
+
+if __name__ == '__main__':
+    test_user_statement_route_streams_csv()
+    test_admin_statement_route_streams_csv()
+    test_statement_route_rejects_bad_dates()
+    print('Statement route tests passed.')
@@ -0,0 +1,75 @@
+import csv
+import io
+import sys
+from pathlib import Path
+from xml.dom import minidom
+# Torna os módulos de orion_flask_project importáveis diretamente
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root / "orion_flask_project"))
+import statement_service
+
+
+USER = {
+    "nome": "joao",
+    "cpf": "11122233344",
+    "balance": 500.0,
+    "transactions": [
+        {"id": "a", "type": "sent", "amount": 100.0, "timestamp": "2025-01-10 10:00:00", "recipient_name": "maria"},
+        {"id": "b", "type": "received", "amount": 50.0, "timestamp": "2025-02-10 10:00:00", "sender_name": "ana"},
+        {"id": "c", "type": "sent", "amount": 25.0, "timestamp": "2025-03-10 10:00:00", "recipient_name": "maria"},
+    ],
+}
+
+
+def test_csv_statement_filters_by_date():
+    start = statement_service.parse_date_filter("2025-02-01")
+    end = statement_service.parse_date_filter("2025-03-10", end_of_day=True)
+    text = "".join(statement_service.iter_csv_statement(USER, start, end))
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == statement_service.CSV_HEADER
+    assert [r[4] for r in rows[1:]] == ["b", "c"]
+    assert rows[2][2] == "-25.00"
+
+
+def test_ofx_statement_lists_every_transaction():
+    text = "".join(statement_service.iter_ofx_statement("u1", USER))
+    assert text.count("<STMTTRN>") == 3
+    assert "<TRNAMT>-100.00</TRNAMT>" in text
+    assert "<BALAMT>500.00</BALAMT>" in text
+
+
+def test_ofx_name_is_truncated_before_escaping():
+    user = dict(USER, transactions=[
+        {"id": "d", "type": "received", "amount": 1.0, "timestamp": "2025-04-10 10:00:00", "sender_name": "A" * 28 + "&B<C>D"},
+    ])
+    text = "".join(statement_service.iter_ofx_statement("u1", user))
+    doc = minidom.parseString(text.encode("utf-8"))
+    assert doc.getElementsByTagName("NAME")[0].firstChild.data == "A" * 28 + "&B<C"
+
+
+def test_bulk_statement_skips_admin():
+    users = {"super_admin": {"is_admin": True, "transactions": [USER["transactions"][0]]}, "u1": USER}
+    text = "".join(statement_service.iter_bulk_csv_statement(users))
+    rows = list(csv.reader(io.StringIO(text)))
+    assert len(rows) == 4
+    assert all(r[0] == "u1" for r in rows[1:])
+
+
+def test_csv_neutralizes_formulas_but_not_amounts():
+    user = dict(USER, nome="=HYPERLINK(\"x\")", transactions=[
+        {"id": "e", "type": "sent", "amount": 5.0, "timestamp": "2025-04-10 10:00:00", "recipient_name": "@SUM(A1)"},
+    ])
+    text = "".join(statement_service.iter_bulk_csv_statement({"u1": user}))
+    row = list(csv.reader(io.StringIO(text)))[1]
+    assert row[1] == "'=HYPERLINK(\"x\")"
+    assert row[5] == "-5.00"
+    assert row[6] == "'@SUM(A1)"
+
+
+if __name__ == '__main__':
+    test_csv_statement_filters_by_date()
+    test_ofx_statement_lists_every_transaction()
+    test_ofx_name_is_truncated_before_escaping()
+    test_bulk_statement_skips_admin()
+    test_csv_neutralizes_formulas_but_not_amounts()
+    print('Statement tests passed.')
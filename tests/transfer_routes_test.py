@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+# Ensure repository root is on sys.path so Python finds the package
+repo_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo_root))
+from orion_flask_project import app as orion_app
+
+
+def make_users():
+    return {
+        uid: {
+            "email": f"{uid}@orion.com",
+            "password_hash": "x",
+            "nome": uid,
+            "cpf": cpf,
+            "is_admin": False,
+            "balance": 1000.0,
+            "transactions": [],
+        }
+        for uid, cpf in (("alice", "11111111111"), ("bob", "22222222222"))
+    }
+
+
+class RecordingMonitor:
+    """Substitui o FraudMonitor registrando as chamadas da rota."""
+
+    def __init__(self, calls, held=()):
+        self.calls = calls
+        self.held = set(held)
+
+    def is_held(self, account_id):
+        return account_id in self.held
+
+    def submit(self, *args):
+        self.calls.append(("submit", args))
+
+
+def transfer(monitor, save_users=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        users_file = os.path.join(tmp, "users.json")
+        with open(users_file, "w") as f:
+            json.dump(make_users(), f)
+        saved = (orion_app.USERS_FILE, orion_app.fraud_monitor, orion_app.save_users)
+        orion_app.USERS_FILE, orion_app.fraud_monitor = users_file, monitor
+        if save_users:
+            orion_app.save_users = save_users
+        try:
+            client = orion_app.app.test_client()
+            with client.session_transaction() as s:
+                s["user_id"] = "alice"
+            response = client.post("/api/transfer", json={"receiver_cpf": "22222222222", "amount": 10})
+            with open(users_file) as f:
+                return response.status_code, json.load(f)
+        finally:
+            orion_app.USERS_FILE, orion_app.fraud_monitor, orion_app.save_users = saved
+
+
+def test_held_sender_is_rejected():
+    calls = []
+    status, users = transfer(RecordingMonitor(calls, held=["alice"]))
+    assert status == 403
+    assert users["alice"]["balance"] == 1000.0
+    assert calls == []
+
+
+def test_event_is_submitted_after_save():
+    calls = []
+    original_save = orion_app.save_users
+
+    def recording_save(users):
+        calls.append(("save", None))
+        original_save(users)
+
+    status, users = transfer(RecordingMonitor(calls), save_users=recording_save)
+    assert status == 200
+    assert users["alice"]["balance"] == 990.0
+    assert [c[0] for c in calls] == ["save", "submit"]
+    assert calls[1][1] == ("alice", "bob", "22222222222", 10.0)
+
+
+def test_failed_save_submits_nothing():
+    calls = []
+
+    def failing_save(users):
+        raise IOError("disco cheio")
+
+    status, _ = transfer(RecordingMonitor(calls), save_users=failing_save)
+    assert status == 500
+    assert calls == []
+
+
+if __name__ == '__main__':
+    test_held_sender_is_rejected()
+    test_event_is_submitted_after_save()
+    test_failed_save_submits_nothing()
+    print('Transfer route tests passed.')